@@ -5,26 +5,133 @@ Converted from Java Spring Boot backend
 Requirements: 6.2, 6.3, 6.5, 7.1, 7.5
 """
 
-from flask import Flask, jsonify, request
-from flask_cors import CORS
+from flask import Flask, Response, jsonify, request
+import atexit
+import json
 import logging
+import os
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 from enum import Enum
-from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Optional
 import threading
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+    from flask_orjson import OrjsonProvider
+except ImportError:  # orjson has no PyPy build; fall back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+    _dumps = orjson.dumps
+else:
+    def _dumps(obj: Any) -> bytes:
+        """Compact stdlib JSON encoding matching orjson's output format"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records unformatted so formatting and I/O happen on a listener
+    thread. The queue and listener are created by the first record in each
+    process rather than at import, so workers forked from a preloading master
+    (uWSGI, gunicorn --preload) start their own after any gevent patching.
+    Until a listener is running, records are written straight to the target.
+    """
+
+    def __init__(self, target: logging.Handler):
+        super().__init__(None)
+        self.target = target
+        self._reset_listener()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_listener)
+
+    def _reset_listener(self):
+        # In a forked child the parent's listener thread no longer exists
+        self._listener = None
+        self._start_claim = threading.Lock()
+
+    def _start_listener(self):
+        self.queue = queue.SimpleQueue()
+        listener = QueueListener(self.queue, self.target)
+        try:
+            listener.start()
+        except RuntimeError:  # threads unavailable; keep writing directly
+            return
+        atexit.register(listener.stop)
+        self._listener = listener
+
+    def handle(self, record):
+        # Started outside the handler lock; the claim is one-shot per process
+        # and never waited on, so concurrent first records cannot deadlock
+        if self._listener is None and self._start_claim.acquire(blocking=False):
+            self._start_listener()
+        return super().handle(record)
+
+    def prepare(self, record):
+        return record
+
+    def emit(self, record):
+        if self._listener is None:
+            self.target.handle(record)
+        else:
+            super().emit(record)
+
+# Configure logging: request threads only enqueue records, a background
+# listener thread formats and writes them
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+logging.basicConfig(level=logging.INFO, handlers=[_DeferredQueueHandler(_log_stream_handler)])
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend access
+if orjson is not None:
+    # Serialize responses with orjson; jsonify() calls are routed through it
+    app.json = OrjsonProvider(app)
+    app.json.option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+# CORS for frontend access. The allowed origin set is static, so the headers
+# are attached directly to responses instead of through an after_request hook
+_CORS_HEADERS = {'Access-Control-Allow-Origin': '*'}
+_PREFLIGHT_RESPONSE = Response(status=200, headers={
+    **_CORS_HEADERS,
+    'Access-Control-Allow-Methods': 'GET, HEAD, OPTIONS',
+    'Access-Control-Allow-Headers': '*',
+})
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """jsonify() a payload with the CORS headers attached"""
+    response = jsonify(payload)
+    response.status_code = status
+    response.headers.update(_CORS_HEADERS)
+    return response
+
+# Per-thread counter shards for monitoring: each OS thread owns a
+# [started, finished] slot that only it writes; readers sum all shards.
+# Shards live in OS-thread local storage. Under gevent threading.local is
+# per-greenlet, which would give every request its own shard, so the
+# unpatched thread-local type is used and a worker keeps one shard per hub.
+# Shards are never discarded: when a thread exits its shard goes on a free
+# list for the next new thread, so thread-per-request servers reuse a table
+# bounded by their peak thread count, and nothing here takes a lock.
+try:
+    from gevent.monkey import get_original
+    _os_thread_local = get_original('_thread', '_local')
+except ImportError:
+    _os_thread_local = threading.local
+_counter_local = _os_thread_local()
+_counter_shards = []  # every shard ever created; only appended to
+_free_shards = []     # shards whose thread has exited, ready for reuse
 
-# Thread-safe counters for monitoring
-request_counter = 0
-concurrent_counter = 0
-counter_lock = threading.Lock()
+class _ShardLease:
+    """Held in a thread's local storage; hands the shard back when the thread exits"""
+    __slots__ = ("shard",)
+
+    def __init__(self, shard):
+        self.shard = shard
+
+    def __del__(self):
+        _free_shards.append(self.shard)
 
 class IceSheetType(Enum):
     GREENLAND = "GREENLAND"
@@ -35,8 +142,12 @@ class TimePeriod(Enum):
     DECADE = "DECADE" 
     CENTURY = "CENTURY"
 
-@dataclass
-class IceSheetBaseData:
+# Flat value -> member tables for request validation, avoiding Enum.__call__
+# and try/except ValueError on every request
+_IS_LOOKUP = {m.value: m for m in IceSheetType}
+_TP_LOOKUP = {m.value: m for m in TimePeriod}
+
+class IceSheetBaseData(NamedTuple):
     """Base data for ice sheets with constants"""
     size_km2: float
     melting_rate_kg_per_second: float
@@ -66,19 +177,39 @@ TIME_PERIOD_SECONDS = {
     TimePeriod.CENTURY: 3_153_600_000   # 100 years in seconds
 }
 
+def _get_counter_shard():
+    """Return the calling thread's counter shard, leasing one on first use"""
+    try:
+        return _counter_local.shard
+    except AttributeError:
+        try:
+            shard = _free_shards.pop()
+        except IndexError:
+            shard = [0, 0]
+            _counter_shards.append(shard)
+        _counter_local.lease = _ShardLease(shard)
+        _counter_local.shard = shard
+        return shard
+
 def increment_counters():
     """Thread-safe counter increment"""
-    global request_counter, concurrent_counter
-    with counter_lock:
-        request_counter += 1
-        concurrent_counter += 1
-        return request_counter
+    _get_counter_shard()[0] += 1
 
 def decrement_concurrent():
     """Thread-safe concurrent counter decrement"""
-    global concurrent_counter
-    with counter_lock:
-        concurrent_counter -= 1
+    _get_counter_shard()[1] += 1
+
+def read_counters():
+    """
+    Sum all shards into (total_requests, current_concurrent).
+    Lock-free snapshot: monitoring tolerates a transient skew while
+    requests are in flight
+    """
+    started = finished = 0
+    for shard in tuple(_counter_shards):
+        started += shard[0]
+        finished += shard[1]
+    return started, max(started - finished, 0)
 
 def get_base_data(ice_sheet_type: IceSheetType) -> IceSheetBaseData:
     """Get base data for a specific ice sheet type"""
@@ -90,194 +221,247 @@ def convert_period_to_seconds(period: TimePeriod) -> float:
     """Convert time period to seconds (Requirements 4.1)"""
     return float(TIME_PERIOD_SECONDS[period])
 
-def calculate_mass_loss(ice_sheet_type: IceSheetType, period: TimePeriod) -> Dict[str, Any]:
+def calculate_mass_loss_raw(ice_sheet_type: IceSheetType, period: TimePeriod) -> Dict[str, Any]:
     """
     Calculate mass loss and visualization statistics
-    Requirements: 4.1, 4.2, 4.3, 6.3, 7.5
+    Requirements: 4.1, 4.2, 4.3
     """
-    request_id = increment_counters()
+    # Get base data (thread-safe - uses immutable constants)
+    base_data = get_base_data(ice_sheet_type)
     
-    try:
-        logger.info(f"Starting calculation request {request_id}")
-        
-        # Get base data (thread-safe - uses immutable constants)
-        base_data = get_base_data(ice_sheet_type)
-        
-        # Convert time period to seconds (Requirement 4.1)
-        time_in_seconds = convert_period_to_seconds(period)
-        
-        # Calculate mass loss = time period × melting rate (Requirement 4.2)
-        mass_loss = time_in_seconds * abs(base_data.melting_rate_kg_per_second)
-        
-        # Calculate final mass = initial size - mass loss (Requirement 4.3)
-        initial_size = base_data.size_km2
-        final_size = initial_size - mass_loss
-        
-        result = {
-            "meltingRate": base_data.melting_rate_kg_per_second,
-            "massLoss": mass_loss,
-            "initialSize": initial_size,
-            "finalSize": final_size,
-            "iceSheetName": base_data.name,
-            "period": period.value
-        }
-        
-        logger.info(f"Completed calculation request {request_id} successfully")
-        return result
-        
-    except Exception as e:
-        logger.error(f"Calculation failed for request {request_id}: {str(e)}")
-        raise
-    finally:
-        decrement_concurrent()
+    # Convert time period to seconds (Requirement 4.1)
+    time_in_seconds = convert_period_to_seconds(period)
+    
+    # Calculate mass loss = time period × melting rate (Requirement 4.2)
+    mass_loss = time_in_seconds * abs(base_data.melting_rate_kg_per_second)
+    
+    # Calculate final mass = initial size - mass loss (Requirement 4.3)
+    initial_size = base_data.size_km2
+    final_size = initial_size - mass_loss
+    
+    return {
+        "meltingRate": base_data.melting_rate_kg_per_second,
+        "massLoss": mass_loss,
+        "initialSize": initial_size,
+        "finalSize": final_size,
+        "iceSheetName": base_data.name,
+        "period": period.value
+    }
 
-def create_error_response(error_type: str, message: str, path: str) -> Dict[str, Any]:
-    """Create standardized error response"""
+def calculate_detail_statistics_raw(ice_sheet_type: IceSheetType) -> Dict[str, Any]:
+    """Build detail statistics for an ice sheet"""
+    base_data = get_base_data(ice_sheet_type)
     return {
-        "error": error_type,
-        "message": message,
-        "path": path,
-        "timestamp": time.time()
+        "currentSize": base_data.size_km2,
+        "ambientTemperature": base_data.ambient_temperature,
+        "meltingRate": base_data.melting_rate_kg_per_second
     }
 
-@app.route('/api/icesheet/<ice_sheet>/details', methods=['GET'])
-def get_detail_statistics(ice_sheet: str):
+# Every input combination is known up front, so results and their JSON
+# encodings are computed once at import time, keyed by the upper-cased
+# request strings so a valid request resolves with a single dict lookup
+_PRECOMPUTED = {
+    (ist, tp): calculate_mass_loss_raw(ist, tp)
+    for ist in IceSheetType for tp in TimePeriod
+}
+_VIZ_CACHE = {
+    (ist.value, tp.value): _dumps(result)
+    for (ist, tp), result in _PRECOMPUTED.items()
+}
+_DETAIL_CACHE = {
+    ist.value: _dumps(calculate_detail_statistics_raw(ist)) for ist in IceSheetType
+}
+
+def _shared_json_response(body: bytes) -> Response:
+    """Build a Response instance that is returned as-is for every matching request"""
+    return Response(body, 200, headers=_CORS_HEADERS, mimetype='application/json', direct_passthrough=True)
+
+_VIZ_RESPONSES = {k: _shared_json_response(v) for k, v in _VIZ_CACHE.items()}
+_DETAIL_RESPONSES = {k: _shared_json_response(v) for k, v in _DETAIL_CACHE.items()}
+
+def lookup_visualization_response(ice_sheet: str, period: Optional[str]) -> Optional[Response]:
+    """
+    Return the shared, precomputed visualization statistics response,
+    or None if the ice sheet/period combination is not valid
+    """
+    return _VIZ_RESPONSES.get((ice_sheet.upper(), (period or "").upper()))
+
+def _error_template(error_type: str, message: str) -> bytes:
+    """
+    Pre-encode the constant parts of an error payload. The message may hold a
+    %b slot for the rejected value; path and timestamp are spliced in per request
+    """
+    return (b'{"error":' + _dumps(error_type) + b',"message":' + _dumps(message)
+            + b',"path":%b,"timestamp":%b}')
+
+_ERR_EMPTY_ICE_SHEET = _error_template(
+    "INVALID_INPUT",
+    "Ice sheet parameter cannot be null or empty. Valid values: GREENLAND, ANTARCTICA")
+_ERR_EMPTY_PERIOD = _error_template(
+    "INVALID_INPUT",
+    "Period parameter cannot be null or empty. Valid values: CENTURY, DECADE, ANNUAL")
+_ERR_INVALID_ICE_SHEET = _error_template(
+    "INVALID_ICE_SHEET",
+    "Invalid ice sheet type: '%b'. Valid values: GREENLAND, ANTARCTICA")
+_ERR_INVALID_ICE_SHEET_PARAMETER = _error_template(
+    "INVALID_PARAMETER",
+    "Invalid ice sheet type: '%b'. Valid values: GREENLAND, ANTARCTICA")
+_ERR_INVALID_PERIOD_PARAMETER = _error_template(
+    "INVALID_PARAMETER",
+    "Invalid time period: '%b'. Valid values: CENTURY, DECADE, ANNUAL")
+_ERR_INTERNAL = _error_template(
+    "INTERNAL_ERROR",
+    "An unexpected error occurred while processing the request. Please try again later.")
+
+def create_error_response(template: bytes, status: int, path: str, value: Optional[str] = None) -> Response:
+    """Create standardized error response from a pre-encoded template"""
+    fields = (_dumps(path), _dumps(time.time()))
+    if value is not None:
+        # JSON-escape the rejected value, without its surrounding quotes
+        fields = (_dumps(value)[1:-1],) + fields
+    return Response(template % fields, status, headers=_CORS_HEADERS, mimetype='application/json')
+
+def detail_input_error_response(ice_sheet: str, path: str) -> Response:
+    """
+    Build the error response for a detail request that missed the cache
+    Requirements: 6.5
+    """
+    if not ice_sheet or ice_sheet.strip() == "":
+        return create_error_response(_ERR_EMPTY_ICE_SHEET, 400, path)
+    
+    if _IS_LOOKUP.get(ice_sheet.upper()) is None:
+        return create_error_response(_ERR_INVALID_ICE_SHEET, 400, path, ice_sheet)
+    
+    # Valid input always has a precomputed response; reaching here is a bug
+    logger.error("No precomputed detail statistics for valid ice sheet: %s", ice_sheet)
+    return create_error_response(_ERR_INTERNAL, 500, path)
+
+def visualization_input_error_response(ice_sheet: str, period: Optional[str], path: str) -> Response:
+    """
+    Build the error response for a visualization request that missed the cache
+    Requirements: 6.5
+    """
+    if not ice_sheet or ice_sheet.strip() == "":
+        return create_error_response(_ERR_EMPTY_ICE_SHEET, 400, path)
+    
+    if not period or period.strip() == "":
+        return create_error_response(_ERR_EMPTY_PERIOD, 400, path)
+    
+    if _IS_LOOKUP.get(ice_sheet.upper()) is None:
+        return create_error_response(_ERR_INVALID_ICE_SHEET_PARAMETER, 400, path, ice_sheet)
+    
+    if _TP_LOOKUP.get(period.upper()) is None:
+        return create_error_response(_ERR_INVALID_PERIOD_PARAMETER, 400, path, period)
+    
+    # Valid input always has a precomputed response; reaching here is a bug
+    logger.error("No precomputed visualization statistics for valid input: %s/%s", ice_sheet, period)
+    return create_error_response(_ERR_INTERNAL, 500, path)
+
+# The detail and visualization handlers take underscore-prefixed keyword
+# defaults that bind module globals they use on every request, so CPython
+# reads them as locals (LOAD_FAST) instead of global/attribute lookups.
+# Flask only passes the URL arguments; the defaults must never be supplied.
+@app.route('/api/icesheet/<ice_sheet>/details', methods=['GET'], provide_automatic_options=False)
+def get_detail_statistics(ice_sheet: str, _request=request, _logger=logger, _now=time.time,
+                          _responses=_DETAIL_RESPONSES):
     """
     Get detail statistics for an ice sheet
     Requirements: 6.2, 6.3, 6.5, 7.1, 7.5
     """
-    start_time = time.time()
+    path = _request.path
+    # Skip timing entirely when INFO logging is disabled
+    log_info = _logger.isEnabledFor(logging.INFO)
+    if log_info:
+        start_time = _now()
     
     try:
-        logger.info(f"Received detail statistics request for ice sheet: {ice_sheet}")
+        _logger.info("Received detail statistics request for ice sheet: %s", ice_sheet)
         
-        # Input validation (Requirements: 6.5)
-        if not ice_sheet or ice_sheet.strip() == "":
-            return jsonify(create_error_response(
-                "INVALID_INPUT",
-                "Ice sheet parameter cannot be null or empty. Valid values: GREENLAND, ANTARCTICA",
-                request.path
-            )), 400
+        result = _responses.get(ice_sheet.upper())
+        if result is None:
+            # Input validation (Requirements: 6.5)
+            return detail_input_error_response(ice_sheet, path)
         
-        try:
-            ice_sheet_type = IceSheetType(ice_sheet.upper())
-        except ValueError:
-            return jsonify(create_error_response(
-                "INVALID_ICE_SHEET",
-                f"Invalid ice sheet type: '{ice_sheet}'. Valid values: GREENLAND, ANTARCTICA",
-                request.path
-            )), 400
-        
-        # Get base data
-        base_data = get_base_data(ice_sheet_type)
-        
-        result = {
-            "currentSize": base_data.size_km2,
-            "ambientTemperature": base_data.ambient_temperature,
-            "meltingRate": base_data.melting_rate_kg_per_second
-        }
+        if log_info:
+            duration = (_now() - start_time) * 1000
+            _logger.info("Successfully processed detail statistics request for %s in %.2fms", ice_sheet, duration)
         
-        duration = (time.time() - start_time) * 1000
-        logger.info(f"Successfully processed detail statistics request for {ice_sheet} in {duration:.2f}ms")
-        
-        return jsonify(result)
+        return result
         
     except Exception as e:
-        logger.error(f"Unexpected error processing detail statistics request for {ice_sheet}: {str(e)}")
-        return jsonify(create_error_response(
-            "INTERNAL_ERROR",
-            "An unexpected error occurred while processing the request. Please try again later.",
-            request.path
-        )), 500
-
-@app.route('/api/icesheet/<ice_sheet>/visualization', methods=['GET'])
-def get_visualization_statistics(ice_sheet: str):
+        _logger.error("Unexpected error processing detail statistics request for %s: %s", ice_sheet, e)
+        return create_error_response(_ERR_INTERNAL, 500, path)
+
+@app.route('/api/icesheet/<ice_sheet>/visualization', methods=['GET'], provide_automatic_options=False)
+def get_visualization_statistics(ice_sheet: str, _request=request, _logger=logger, _now=time.time,
+                                 _lookup=lookup_visualization_response):
     """
     Get visualization statistics for an ice sheet over a time period
     Requirements: 6.2, 6.3, 6.5, 7.1, 7.5
     """
-    start_time = time.time()
-    period = request.args.get('period')
+    path = _request.path
+    # Skip timing entirely when INFO logging is disabled
+    log_info = _logger.isEnabledFor(logging.INFO)
+    if log_info:
+        start_time = _now()
+    period = _request.args.get('period')
     
     try:
-        logger.info(f"Received visualization statistics request for ice sheet: {ice_sheet}, period: {period}")
-        
-        # Input validation (Requirements: 6.5)
-        if not ice_sheet or ice_sheet.strip() == "":
-            return jsonify(create_error_response(
-                "INVALID_INPUT",
-                "Ice sheet parameter cannot be null or empty. Valid values: GREENLAND, ANTARCTICA",
-                request.path
-            )), 400
+        _logger.info("Received visualization statistics request for ice sheet: %s, period: %s", ice_sheet, period)
         
-        if not period or period.strip() == "":
-            return jsonify(create_error_response(
-                "INVALID_INPUT",
-                "Period parameter cannot be null or empty. Valid values: CENTURY, DECADE, ANNUAL",
-                request.path
-            )), 400
+        statistics = _lookup(ice_sheet, period)
+        if statistics is None:
+            # Input validation (Requirements: 6.5)
+            return visualization_input_error_response(ice_sheet, period, path)
         
+        # Statistics are calculated at import by calculate_mass_loss_raw;
+        # the counters track served visualization requests for /health
+        increment_counters()
         try:
-            ice_sheet_type = IceSheetType(ice_sheet.upper())
-        except ValueError:
-            return jsonify(create_error_response(
-                "INVALID_PARAMETER",
-                f"Invalid ice sheet type: '{ice_sheet}'. Valid values: GREENLAND, ANTARCTICA",
-                request.path
-            )), 400
-        
-        try:
-            time_period = TimePeriod(period.upper())
-        except ValueError:
-            return jsonify(create_error_response(
-                "INVALID_PARAMETER",
-                f"Invalid time period: '{period}'. Valid values: CENTURY, DECADE, ANNUAL",
-                request.path
-            )), 400
-        
-        # Calculate statistics
-        statistics = calculate_mass_loss(ice_sheet_type, time_period)
-        
-        duration = (time.time() - start_time) * 1000
-        logger.info(f"Successfully processed visualization statistics request for {ice_sheet}/{period} in {duration:.2f}ms")
-        
-        return jsonify(statistics)
+            if log_info:
+                duration = (_now() - start_time) * 1000
+                _logger.info("Successfully processed visualization statistics request for %s/%s in %.2fms", ice_sheet, period, duration)
+            
+            return statistics
+        finally:
+            decrement_concurrent()
         
     except Exception as e:
-        logger.error(f"Unexpected error processing visualization statistics request for {ice_sheet}/{period}: {str(e)}")
-        return jsonify(create_error_response(
-            "INTERNAL_ERROR",
-            "An unexpected error occurred while processing the request. Please try again later.",
-            request.path
-        )), 500
-
-@app.route('/api/icesheet/health', methods=['GET'])
+        _logger.error("Unexpected error processing visualization statistics request for %s/%s: %s", ice_sheet, period, e)
+        return create_error_response(_ERR_INTERNAL, 500, path)
+
+@app.route('/api/icesheet/health', methods=['GET'], provide_automatic_options=False)
 def get_health_status():
     """Health check endpoint to monitor system status"""
     try:
-        with counter_lock:
-            total_requests = request_counter
-            current_concurrent = concurrent_counter
+        # Unlocked snapshot; monitoring tolerates a transient skew
+        total_requests, current_concurrent = read_counters()
         
-        return jsonify({
+        # Encode directly, skipping jsonify; this is polled frequently by monitoring
+        return Response(_dumps({
             "status": "UP",
             "totalCalculatorRequests": total_requests,
             "currentConcurrentRequests": current_concurrent,
             "totalDataServiceRequests": total_requests
-        })
+        }), headers=_CORS_HEADERS, mimetype='application/json')
     except Exception as e:
-        logger.error(f"Error retrieving health status: {str(e)}")
-        return jsonify({
+        logger.error("Error retrieving health status: %s", e)
+        return json_response({
             "status": "DOWN",
             "totalCalculatorRequests": 0,
             "currentConcurrentRequests": 0,
             "totalDataServiceRequests": 0
-        }), 503
+        }, 503)
+
+@app.route('/api/<path:path>', methods=['OPTIONS'])
+def cors_preflight(path: str):
+    """Answer CORS preflight requests for API routes with a shared response"""
+    return _PREFLIGHT_RESPONSE
 
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint for basic connectivity test"""
-    return jsonify({
+    return json_response({
         "message": "Ice Sheet Visualization API",
         "status": "running",
         "endpoints": [
@@ -288,5 +472,7 @@ def root():
     })
 
 if __name__ == '__main__':
-    # For local development
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Local development only. For production run under gunicorn with gevent
+    # workers (pip install -r requirements-prod.txt) instead of the Werkzeug dev server:
+    #   gunicorn -k gevent -w $(nproc) -b 0.0.0.0:5000 app:app
+    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file